@@ -2,23 +2,16 @@ from typing import Dict, Tuple
 
 import numpy as np
 import pandas as pd
-
-_SMALL = 1e-20
+from scipy.special import xlogy
 
 
 def compute_expected(observed: np.array) -> np.array:
     """Computes the contingency table of the expected values given a contingency table
     of the observed values."""
-    expected = np.array([
-        [
-            observed[0, :].sum() * observed[:, 0].sum() / observed.sum(),
-            observed[0, :].sum() * observed[:, 1].sum() / observed.sum()
-        ],
-        [
-            observed[1, :].sum() * observed[:, 0].sum() / observed.sum(),
-            observed[1, :].sum() * observed[:, 1].sum() / observed.sum()
-        ]
-    ])
+    row_sums = observed.sum(axis=1)
+    col_sums = observed.sum(axis=0)
+    total = row_sums.sum()
+    expected = np.outer(row_sums, col_sums) / total
     return expected
 
 
@@ -41,11 +34,9 @@ def get_complement_from_row(row: Dict, source: str) -> float:
 def compute_log_likelihood_from_observed(observed: np.array) -> Tuple[float, str]:
     """Computes the log likelihood ratio for given a target token, and target and
     reference analysers and counters."""
-    sum_likelihood = 0
     expected = compute_expected(observed)
-    for i in [0, 1]:
-        for j in [0, 1]:
-            sum_likelihood += observed[i, j] * np.log((observed[i, j] + _SMALL) / (expected[i, j] + _SMALL))
+    # xlogy(0, 0) is 0, so empty cells contribute nothing to the sum
+    sum_likelihood = np.sum(xlogy(observed, observed) - xlogy(observed, expected))
     return 2 * sum_likelihood, 'more' if observed[0, 0] > expected[0, 0] else 'less'
 
 
@@ -62,9 +53,10 @@ def compute_category_totals(keyword_cat_freq: pd.DataFrame) -> pd.DataFrame:
 
     For each category, the total is the total of the category as target category.
     The complement is the total of the reference corpus."""
-    keyword_cat_totals = keyword_cat_freq.sum()
-    keyword_cat_totals = keyword_cat_totals.rename('target_freq').to_frame()
-    keyword_cat_totals['ref_freq'] = (keyword_cat_totals.loc['Total'] - keyword_cat_totals)
+    target_freq = keyword_cat_freq.sum().to_numpy()
+    total = target_freq[keyword_cat_freq.columns.get_loc('Total')]
+    keyword_cat_totals = pd.DataFrame({'target_freq': target_freq, 'ref_freq': total - target_freq},
+                                      index=keyword_cat_freq.columns)
     return keyword_cat_totals
 
 
@@ -78,21 +70,36 @@ def compute_keyword_category_freq(df: pd.DataFrame, category_col: str,
 
 def compute_keyness(keyword_cat_freq: pd.DataFrame, keyword_cat_totals: pd.DataFrame,
                     category: str) -> pd.Series:
+    """Compute the log likelihood of each keyword for the given category.
+
+    Builds the contingency tables of all keywords at once, with the four cells
+    as rows of a (4, n_keywords) array, instead of one table per keyword."""
     # keyword_cat_totals = compute_category_totals(keyword_cat_freq)
-    return keyword_cat_freq.apply(lambda keyword: compute_log_likelihood_from_row(keyword,
-                                                                                  category,
-                                                                                  keyword_cat_totals), axis=1)
+    t_target = keyword_cat_freq[category].to_numpy(dtype=float)
+    t_ref = keyword_cat_freq['Total'].to_numpy(dtype=float) - t_target
+    nt_target = keyword_cat_totals.loc[category].target_freq - t_target
+    nt_ref = keyword_cat_totals.loc[category].ref_freq - t_ref
+    observed = np.stack([t_target, t_ref, nt_target, nt_ref])
+    row_sums = np.stack([t_target + t_ref, nt_target + nt_ref])
+    col_sums = np.stack([t_target + nt_target, t_ref + nt_ref])
+    total = row_sums.sum(axis=0)
+    expected = (row_sums[:, None, :] * col_sums[None, :, :] / total).reshape(4, -1)
+    sum_likelihood = np.sum(xlogy(observed, observed) - xlogy(observed, expected), axis=0)
+    return pd.Series(2 * sum_likelihood, index=keyword_cat_freq.index)
 
 
 def compute_percent_diff(keyword_cat_freq: pd.DataFrame, cat_totals: pd.DataFrame):
-    percent_diff = pd.DataFrame()
-    for category in keyword_cat_freq.columns:
-        if category == 'Total':  # != genre:
-            continue
-        keyword_cat_frac_target = keyword_cat_freq / cat_totals.target_freq
-        keyword_cat_frac_ref = (keyword_cat_freq.Total - keyword_cat_freq[category]) / cat_totals.loc[category].ref_freq
-        percent_diff[category] = 100 * (keyword_cat_frac_target[category] - keyword_cat_frac_ref) / keyword_cat_frac_ref
-    return percent_diff
+    """Compute the %DIFF of each keyword for all categories at once, comparing
+    the keyword fraction in the category with the fraction in all other categories."""
+    categories = keyword_cat_freq.columns.drop('Total')
+    keyword_freq = keyword_cat_freq[categories].to_numpy(dtype=float)
+    keyword_total = keyword_cat_freq['Total'].to_numpy(dtype=float)
+    keyword_cat_frac_target = keyword_freq / cat_totals.target_freq[categories].to_numpy()
+    keyword_cat_frac_ref = (keyword_total[:, None] - keyword_freq) / cat_totals.ref_freq[categories].to_numpy()
+    # keywords that only occur in the target category get an infinite %DIFF, as with pandas
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent_diff = 100 * (keyword_cat_frac_target - keyword_cat_frac_ref) / keyword_cat_frac_ref
+    return pd.DataFrame(percent_diff, index=keyword_cat_freq.index, columns=categories)
 
 """
 def compute_percent_diff(keyword_cat_freq: pd.DataFrame, cat_totals: pd.DataFrame):
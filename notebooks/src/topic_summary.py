@@ -4,26 +4,229 @@ mapping genres to novels by ISBN, and analyzing Top2Vec models.
 """
 
 import ast
-import gzip
+import hashlib
+import multiprocessing
 import warnings
 import os
 import re
-from typing import List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, List, Optional, Union
+import joblib
 import numpy as np
 import pandas as pd
 from top2vec import Top2Vec
 from tqdm import tqdm
-from scipy.spatial.distance import cosine
 warnings.filterwarnings("ignore", module="umap")
 warnings.filterwarnings("ignore", module="numba")
 
+try:
+    import pyarrow  # noqa: F401
+    _HAVE_PYARROW = True
+except ImportError:
+    _HAVE_PYARROW = False
+
+# pyarrow decompresses and parses CSV files with multiple threads
+_CSV_ENGINE = 'pyarrow' if _HAVE_PYARROW else 'c'
+
+try:
+    import rapidgzip
+    _HAVE_RAPIDGZIP = True
+except ImportError:
+    _HAVE_RAPIDGZIP = False
+
+# read compressed files from disk in 1 MiB blocks instead of the default 8 KiB
+_READ_BUFFER_SIZE = 1 << 20
+
+# minimum and maximum document frequency in a model file name, e.g. '0.01_0.1'
+_FREQUENCY_RE = re.compile(r'(\d+\.\d+_\d+\.\d+)')
+
+try:
+    from numba import config as numba_config, njit, prange, set_num_threads
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+
+# below this number of topics, the numba kernel is faster than the matrix product
+_NUMBA_MAX_TOPICS = 16
+
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _least_similar_topics(dv, tv, tv_norms):
+        """
+        Returns for each document vector the topic with the lowest cosine similarity,
+        without building the full document-topic similarity matrix.
+        fastmath may reorder the sums, so near-ties can resolve to a different topic.
+        """
+        num_docs, num_dims = dv.shape
+        num_topics = tv.shape[0]
+        document_topics = np.empty(num_docs, dtype=np.int64)
+        for i in prange(num_docs):
+            doc_norm = 0.0
+            for j in range(num_dims):
+                doc_norm += dv[i, j] * dv[i, j]
+            doc_norm = np.sqrt(doc_norm)
+            lowest_topic = 0
+            lowest_sim = np.inf
+            for k in range(num_topics):
+                dot = 0.0
+                for j in range(num_dims):
+                    dot += dv[i, j] * tv[k, j]
+                sim = dot / (doc_norm * tv_norms[k])
+                if sim < lowest_sim:
+                    lowest_sim = sim
+                    lowest_topic = k
+            document_topics[i] = lowest_topic
+        return document_topics
+
+
+def _available_cpus() -> int:
+    """Return the number of CPUs this process may run on, respecting CPU affinity."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# environment variables that limit the threads of the BLAS and OpenMP libraries
+_THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']
+
+
+@contextmanager
+def _thread_env(num_threads: int):
+    """
+    Set the BLAS and OpenMP thread limits in the environment, for the processes
+    started within the context. They are read when those libraries are loaded,
+    so they cannot be set in a worker process that has already imported numpy.
+    """
+    saved_env = {var: os.environ.get(var) for var in _THREAD_ENV_VARS}
+    os.environ.update({var: str(num_threads) for var in _THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _limit_threads(num_threads: int):
+    """Limit the number of threads numba uses in a worker process."""
+    if _HAVE_NUMBA:
+        # numba does not accept more threads than it was configured with
+        set_num_threads(max(1, min(num_threads, numba_config.NUMBA_NUM_THREADS)))
+
+
+def read_gzipped_tsv(path: str, dtype: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Read a gzipped TSV file, decompressing it in parallel with rapidgzip and
+    parsing it with the pyarrow parser if they are installed.
+
+    The pyarrow parser infers column types differently from the C parser (e.g. it
+    parses ISO dates into dates), so pin the types of the columns you rely on with `dtype`.
+
+    Parameters:
+        path (str): Path to the gzipped TSV file.
+        dtype (dict, optional): dtypes of specific columns.
+
+    Returns:
+        pd.DataFrame: Dataframe with the contents of the file.
+    """
+    if _HAVE_RAPIDGZIP:
+        # parallelization=0 uses all available cores
+        with rapidgzip.open(path, parallelization=0) as gzip_file:
+            return pd.read_csv(gzip_file, sep='\t', dtype=dtype, engine=_CSV_ENGINE)
+    with open(path, 'rb', buffering=_READ_BUFFER_SIZE) as raw_file:
+        return pd.read_csv(raw_file, sep='\t', compression='gzip', dtype=dtype,
+                           engine=_CSV_ENGINE)
+
+
+def read_tsv(path: str, dtype: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Read a TSV file without using its first column as index, using the
+    multithreaded pyarrow parser if it is installed. Files that the pyarrow parser
+    rejects, e.g. with a trailing delimiter on the rows, are read with the C parser.
+
+    Parameters:
+        path (str): Path to the TSV file.
+        dtype (dict, optional): dtypes of specific columns.
+
+    Returns:
+        pd.DataFrame: Dataframe with the contents of the file.
+    """
+    if _HAVE_PYARROW:
+        try:
+            # the pyarrow engine never uses a column as index and does not accept index_col=False
+            return pd.read_csv(path, sep='\t', dtype=dtype, engine='pyarrow')
+        except pd.errors.ParserError:
+            pass
+    # index_col=False makes the C parser ignore a trailing delimiter on the rows
+    return pd.read_csv(path, sep='\t', dtype=dtype, index_col=False)
+
+
+def load_cached_frame(cache_name: str, source_files: List[str],
+                      build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Load a processed dataframe from a Feather cache file, or build it and write the cache.
+
+    The cache file is stored next to the first source file, and its name contains a hash
+    of the paths of all source files, so each combination of inputs has its own cache.
+    The cache is only used if it is newer than all source files and than this module,
+    so it is rebuilt when the inputs or the processing change. A cache that cannot be
+    read is rebuilt, and a failed write is reported without leaving a partial cache file.
+    Without pyarrow, the dataframe is always built and no cache is written.
+
+    Parameters:
+        cache_name (str): Name of the processed dataframe, used in the cache file name.
+        source_files (List[str]): Paths to the files the dataframe is built from.
+        build (Callable[[], pd.DataFrame]): Function that builds the dataframe,
+            with a default index.
+
+    Returns:
+        pd.DataFrame: The processed dataframe.
+    """
+    if not _HAVE_PYARROW:
+        return build()
+
+    sources_key = hashlib.sha1(
+        '\n'.join(os.path.abspath(source) for source in source_files).encode()
+    ).hexdigest()[:12]
+    cache_file = f"{source_files[0]}.{cache_name}.{sources_key}.feather"
+
+    if os.path.exists(cache_file):
+        cache_time = os.path.getmtime(cache_file)
+        if all(os.path.getmtime(source) < cache_time for source in source_files + [__file__]):
+            try:
+                return pd.read_feather(cache_file)
+            except (OSError, ValueError) as error:
+                print(f"Error reading cache {cache_file}: {str(error)}")
+
+    df = build()
+    # write to a temporary file first, so a failed write never leaves a truncated cache
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        df.to_feather(temp_file)
+        os.replace(temp_file, cache_file)
+    except (OSError, ValueError) as error:
+        print(f"Error saving cache {cache_file}: {str(error)}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    return df
+
 
 class ReviewExtractor:
     """ Map reviews to novels by work-id """
 
-    def __init__(self, review_dir: str, raw_review_data: str):
+    def __init__(self, review_dir: str, raw_review_data: str, use_cache: bool = True):
         self.review_dir = review_dir
         self.raw_review_data = raw_review_data
+        self.use_cache = use_cache
+
+    # read the identifiers and terms as strings, whichever parser is used
+    STRING_DTYPES = {'doc_id': str, 'review_id': str, 'work_id': str, 'impact_term': str}
 
     def load_review_impact_matches(self) -> pd.DataFrame:
         """
@@ -32,8 +235,7 @@ class ReviewExtractor:
         Returns:
             pd.DataFrame: Dataframe containing the impact reviews
         """
-        with gzip.open(self.review_dir, 'rt') as file:
-            return pd.read_csv(file, sep='\t')
+        return read_gzipped_tsv(self.review_dir, dtype=self.STRING_DTYPES)
 
     def load_review_stats(self) -> pd.DataFrame:
         """
@@ -42,17 +244,24 @@ class ReviewExtractor:
         Returns:
             pd.DataFrame: Dataframe containing the review info about title and authors.
         """
-        with gzip.open(self.raw_review_data, 'rt') as file:
-            return pd.read_csv(file, sep='\t')
+        return read_gzipped_tsv(self.raw_review_data, dtype=self.STRING_DTYPES)
 
     def get_impact_reviews(self) -> pd.DataFrame:
         """
         Get impact reviews by merging review statistics and review impact matches.
+        If `use_cache` is set, the result is cached next to the review impact matches.
+
         Returns:
             pd.DataFrame: Dataframe containing the impact reviews with
             their relative info about the authors and titles of the books
         """
+        if not self.use_cache:
+            return self._merge_impact_reviews()
+        return load_cached_frame("impact_reviews",
+                                 [self.review_dir, self.raw_review_data],
+                                 self._merge_impact_reviews)
 
+    def _merge_impact_reviews(self) -> pd.DataFrame:
         reviews = self.load_review_stats()
         raw_data = self.load_review_impact_matches()
 
@@ -72,12 +281,17 @@ class ReviewExtractor:
 class NurGenreMapper:
     """ Map genres to novels by isbn """
 
-    def __init__(self, isbn_map: str, isbn_work_id_mappings_file: str):
+    def __init__(self, isbn_map: str, isbn_work_id_mappings_file: str, use_cache: bool = True):
         self.isbn_map = isbn_map
         self.isbn_work_id_mappings_file = isbn_work_id_mappings_file
+        self.use_cache = use_cache
 
     GENRE_VOCABS = ['nur', 'thema', 'bisac', 'brinkman', 'unesco']
 
+    # matches the items of a string representation of a list of NUR codes, e.g. "['300', '301']".
+    # Only valid for lists of codes: items in double quotes, as in "foto's", are not matched.
+    _LIST_ITEM_RE = re.compile(r"'([^']*)'")
+
     genres = [
         "Young_adult", "Historical_fiction", "Fantasy_fiction", "Romanticism",
         "Literary_thriller", "Children_fiction", "Suspense", "Regional_fiction",
@@ -106,6 +320,19 @@ class NurGenreMapper:
         344: "Regional_fiction"
     }
 
+    # rank of each NUR code below 350, indexed by the code: the mapped codes rank
+    # by their position in NUR_MAPPINGS, followed by other fiction and non-fiction.
+    # The lowest ranked NUR code that a book has determines its genre.
+    _OTHER_FICTION_RANK = len(NUR_MAPPINGS)
+    _NON_FICTION_RANK = len(NUR_MAPPINGS) + 1
+    _RANK_GENRES = np.array(list(NUR_MAPPINGS.values()) + ["Other fiction", "Non-fiction"],
+                            dtype=object)
+    _NUR_RANK = np.full(350, _NON_FICTION_RANK)
+    _NUR_RANK[280:350] = _OTHER_FICTION_RANK
+    _NUR_RANK[list(NUR_MAPPINGS)] = np.arange(len(NUR_MAPPINGS))
+    # genre of each NUR code below 350
+    _NUR_GENRES = _RANK_GENRES[_NUR_RANK]
+
     def nur_genre(self, nur) -> str:
         """
         Categorises nur values into a genre
@@ -117,10 +344,8 @@ class NurGenreMapper:
         """
         if pd.isna(nur):
             return np.nan
-        if nur in self.NUR_MAPPINGS:
-            return self.NUR_MAPPINGS[nur]
-        if 280 <= nur < 350:
-            return "Other fiction"
+        if 0 <= nur < len(self._NUR_GENRES):
+            return self._NUR_GENRES[int(nur)]
         return "Non-fiction"
 
     @staticmethod
@@ -152,36 +377,68 @@ class NurGenreMapper:
             Optional[str]: The corresponding genre or None.
         """
         if isinstance(nurs, list):
-            nurs = [nur for nur in nurs if nur != '']
-
-            for nur in self.NUR_MAPPINGS:
-                if str(nur) in nurs:
-                    return self.NUR_MAPPINGS[nur]
-
-            if any((280 <= int(nur) < 350) for nur in nurs):
-                return "Other fiction"
-            return "Non-fiction"
+            rank = self._NON_FICTION_RANK
+            for nur in nurs:
+                try:
+                    code = int(nur)
+                except ValueError:
+                    continue
+                if 0 <= code < len(self._NUR_RANK):
+                    rank = min(rank, self._NUR_RANK[code])
+            return self._RANK_GENRES[rank]
         if pd.isna(nurs):
             return nurs
 
         print(nurs, type(nurs))
         return None
 
+    def map_genres(self, nurs: pd.Series) -> pd.Series:
+        """
+        Maps a series of lists of NUR codes/values to genres, in the same way as
+        `map_genre` but with vectorized operations instead of a function call per row.
+
+        Parameters:
+            nurs (pd.Series): Series of lists of NUR codes/values, with a unique index.
+
+        Returns:
+            pd.Series: The corresponding genres, NaN where the list is missing.
+        """
+        codes = nurs.explode().dropna()
+        numbers = pd.to_numeric(codes, errors='coerce').to_numpy(dtype=float)
+
+        # look up the rank of the integer codes in range, all others are non-fiction
+        in_table = (numbers >= 0) & (numbers < len(self._NUR_RANK)) & (numbers == np.floor(numbers))
+        ranks = np.full(len(numbers), self._NON_FICTION_RANK)
+        ranks[in_table] = np.take(self._NUR_RANK, numbers[in_table].astype(int))
+        rank = pd.Series(ranks, index=codes.index).groupby(level=0).min()
+
+        genres = pd.Series(np.nan, index=nurs.index, dtype=object)
+        genres[nurs.notna()] = "Non-fiction"
+        genres[rank.index] = self._RANK_GENRES[rank.to_numpy()]
+        return genres
+
     def process_genre_mapping(self) -> pd.DataFrame:
         """
         Process the genre mappings from a file and filter based on certain conditions.
+        If `use_cache` is set, the result is cached next to the mappings file.
 
         Returns:
             pd.DataFrame: A filtered dataframe with work_id, record_id (isbn), and nur_genre.
         """
+        if not self.use_cache:
+            return self._process_genre_mapping()
+        return load_cached_frame("genre_mapping",
+                                 [self.isbn_work_id_mappings_file],
+                                 self._process_genre_mapping)
+
+    def _process_genre_mapping(self) -> pd.DataFrame:
         dtype = {vocab: str for vocab in self.GENRE_VOCABS}
 
-        mapping = pd.read_csv(self.isbn_work_id_mappings_file,
-                              index_col=False, sep='\t', dtype=dtype)
-        for vocab in self.GENRE_VOCABS:
-            mapping[vocab] = mapping[vocab].apply(self.map_list)
+        mapping = read_tsv(self.isbn_work_id_mappings_file, dtype=dtype)
+        # only the NUR codes are used, so the other vocabularies are not parsed
+        mapping['nur'] = mapping['nur'].str.findall(self._LIST_ITEM_RE)
 
-        mapping['nur_genre'] = mapping['nur'].apply(self.map_genre)
+        mapping['nur_genre'] = self.map_genres(mapping['nur'])
         # create minimal dataframe, and select only the isbn entries
         isbn_work_id_map_filtered = mapping[
             mapping['record_id_type'] == 'isbn'][['work_id', 'record_id', 'nur_genre']]
@@ -189,7 +446,7 @@ class NurGenreMapper:
         # note that `record_id` is our isbn
         # I rename it for clarity
         isbn_work_id_map_filtered = isbn_work_id_map_filtered.rename(columns={'record_id': 'isbn'})
-        return isbn_work_id_map_filtered
+        return isbn_work_id_map_filtered.reset_index(drop=True)
 
     def process_isbn_nur_mapping(self) -> pd.DataFrame:
         """
@@ -203,7 +460,7 @@ class NurGenreMapper:
             'nur': str
         }
 
-        isbn_map_df = pd.read_csv(self.isbn_map, index_col=False, sep='\t', dtype=dtype)
+        isbn_map_df = read_tsv(self.isbn_map, dtype=dtype)
         # filter-out unnecessary columns
         isbn_map_filtered = isbn_map_df[['isbn', 'author', 'title', 'nur']]
         return isbn_map_filtered
@@ -211,10 +468,18 @@ class NurGenreMapper:
     def merge_isbn_nur_genre(self) -> pd.DataFrame:
         """
         Merge the processed genre mappings and ISBN to NUR mappings on the ISBN column.
+        If `use_cache` is set, the result is cached next to the ISBN to NUR mappings file.
 
         Returns:
             pd.DataFrame: Merged dataframe with information from both mappings.
         """
+        if not self.use_cache:
+            return self._merge_isbn_nur_genre()
+        return load_cached_frame("isbn_nur_genre",
+                                 [self.isbn_map, self.isbn_work_id_mappings_file],
+                                 self._merge_isbn_nur_genre)
+
+    def _merge_isbn_nur_genre(self) -> pd.DataFrame:
         isbn_work_id_map_filtered = self.process_genre_mapping()
         isbn_map_filtered = self.process_isbn_nur_mapping()
         df_mapped_isbn = pd.merge(
@@ -226,6 +491,15 @@ class NurGenreMapper:
 class ModelAnalyser:
     """ analyses the Top2Vec output """
 
+    MODEL_TYPES = ['balanced', 'unbalanced']
+    WINDOWS = ['5000', 'full_doc']
+
+    METADATA_DTYPES = {
+        'type': pd.CategoricalDtype(MODEL_TYPES),
+        'genre': pd.CategoricalDtype(NurGenreMapper.genres),
+        'window': pd.CategoricalDtype(WINDOWS)
+    }
+
     @staticmethod
     def _get_file_paths(directory: str):
         """
@@ -241,20 +515,36 @@ class ModelAnalyser:
         if not os.path.exists(directory):
             raise ValueError(f"The specified directory '{directory}' does not exist.")
 
-        all_entries = os.listdir(directory)
-
-        model_file_paths = [
-            os.path.join(directory, entry)
-            for entry in all_entries
-            # filter by '.model' files
-            if os.path.isfile(os.path.join(directory, entry)) and entry.endswith('.model')
-        ]
+        # scandir entries know their file type from the directory listing,
+        # so this needs no extra stat call per file
+        with os.scandir(directory) as entries:
+            model_file_paths = [
+                entry.path
+                for entry in entries
+                # filter by '.model' files
+                if entry.is_file() and entry.name.endswith('.model')
+            ]
 
         return model_file_paths
 
     @staticmethod
-    def load_model(path: str):
-        """Load top2vec model"""
+    def load_model(path: str, mmap_mode: Optional[str] = None):
+        """
+        Load top2vec model
+
+        Parameters:
+            - path (str): Path to the model file.
+            - mmap_mode (str, optional): If set (e.g. 'r'), the model is unpickled with
+              joblib and its arrays are memory-mapped from the file instead of read into
+              memory. Only the model's attributes are restored, not its search indexes,
+              and with 'r' the arrays are read-only.
+
+        Returns:
+            - Top2Vec: the loaded model
+        """
+        if mmap_mode is not None:
+            # Top2Vec.save dumps the model uncompressed with joblib, so it can be memory-mapped
+            return joblib.load(path, mmap_mode=mmap_mode)
         return Top2Vec.load(path)
 
     @staticmethod
@@ -268,66 +558,57 @@ class ModelAnalyser:
         from the models output"""
         return model.document_vectors, model.topic_vectors, model.word_vectors
 
-    def load_model_components(self, path: str):
+    def load_model_components(self, path: str, mmap_mode: Optional[str] = None):
         """
         Load necessary components of the model
 
         Parameters:
             - path (str): Path to the model file.
+            - mmap_mode (str, optional): memory-map the model arrays, see `load_model`.
 
         Returns:
             - tuple: (model_name, model, document_vectors, topic_vectors, word_vectors)
         """
 
         model_name = self.get_model_name(path)
-        model = self.load_model(path)
+        model = self.load_model(path, mmap_mode=mmap_mode)
         dv, tv, wv = self.get_vectors_from_model(model)
         document_ids = model.document_ids
 
         return model_name, model, dv, tv, wv, document_ids
 
-    def extract_model_metadata(self, path: str) -> pd.DataFrame:
+    def extract_model_metadata(self, path: str) -> dict:
         """
-        Generate a DataFrame from provided file paths of model files.
+        Extract the model metadata from the file name of a model file.
 
         Parameters:
-        - path (list of str): A list of full file paths to model files.
+        - path (str): full file path to the model file.
 
         Returns:
-        - DataFrame: A pandas DataFrame with columns:
-          * Model Name
-          * Type (balanced/unbalanced)
-          * Frequency
-          * Genre
-          * Window (fine-grained/coarse-grained)
+        - dict: metadata with keys:
+          * model (Model Name)
+          * type (balanced/unbalanced)
+          * frequency
+          * genre
+          * window (fine-grained/coarse-grained)
         """
-        genres = NurGenreMapper.genres
-
-        data = []
-
         model_name = self.get_model_name(path)
 
         # type
         type_ = "balanced" if "balanced" in model_name else "unbalanced"
 
         # frequency
-        freq_match = re.search(r'(\d+\.\d+_\d+\.\d+)', model_name)
+        freq_match = _FREQUENCY_RE.search(model_name)
         frequency = freq_match.group(1) if freq_match else None
 
         # genre
-        genre = None
-        for genre_ in genres:
-            if genre_ in model_name:
-                genre = genre_
-                break
+        genre = next((genre_ for genre_ in NurGenreMapper.genres if genre_ in model_name), None)
 
         # window
         window = "5000" if "5000" in model_name else "full_doc"
 
-        data.append([model_name, type_, frequency, genre, window])
-
-        df = pd.DataFrame(data, columns=['model', 'type', 'frequency', 'genre', 'window'])
-        return df
+        return {'model': model_name, 'type': type_, 'frequency': frequency,
+                'genre': genre, 'window': window}
 
     @staticmethod
     def get_model_statistics(model_name, dv, tv, wv):
@@ -360,65 +641,87 @@ class ModelAnalyser:
         - dv (numpy.ndarray): Document vectors.
         - tv (numpy.ndarray): Topic vectors.
         - document_ids (list): List of document IDs corresponding to the document vectors.
-        - document_topics (set): Set of topic numbers
+        - document_topics (numpy.ndarray): topic number of each document
 
         Returns:
         - pd.DataFrame: A dataframe detailing the association between topics and books (by ISBN).
-        - topics_with_isbn (set): topics that have an associated ISBN.
-        - topics_without_isbn (set): topics that don't have an associated ISBN.
+        - topics_with_isbn (numpy.ndarray): topics that have an associated ISBN.
+        - topics_without_isbn (numpy.ndarray): topics that don't have an associated ISBN.
         """
 
-        all_topics = set(range(tv.shape[0]))
-
-        df = pd.DataFrame()
-
-        df['isbn'] = [i.split('-')[0] for i in document_ids]
-        df['topic_number'] = document_topics
-        df['model'] = model_name
+        # keep the topic numbers as an int64 array, so the column is not boxed as objects
+        document_topics = np.asarray(document_topics, dtype=np.int64)
+        df = pd.DataFrame({
+            # partition only splits at the first '-' and builds no list per id
+            'isbn': [i.partition('-')[0] for i in document_ids],
+            'topic_number': document_topics,
+            'model': model_name,
+        })
 
         # Identifying topics with ISBN
         topics_with_isbn = df['topic_number'].unique()
 
         # Identifying topics without ISBN
-        topics_without_isbn = all_topics - set(topics_with_isbn)
+        has_isbn = np.zeros(tv.shape[0], dtype=bool)
+        has_isbn[document_topics] = True
+        topics_without_isbn = np.flatnonzero(~has_isbn)
 
         return df, topics_with_isbn, topics_without_isbn
 
-    def get_topics(self, file_paths, verbose=False):
+    @staticmethod
+    def get_topics(model_name, dv, tv, verbose=False, chunk_size=4096):
         """
         Returns topics that are both the closest to any document or not
 
         Parameters:
-        - file_paths (str): paths to the Top2Vec models.
+        - model_name (str): The name of the model.
+        - dv (numpy.ndarray): Document vectors.
+        - tv (numpy.ndarray): Topic vectors.
+        - verbose (bool, optional): If True, the model name will be printed.
+        - chunk_size (int, optional): number of documents scored per matrix product.
 
         Returns:
-        - unused_topics: List of unused topics (topics not closest to any document)
-        for the last model in the file_paths.
-        - document_topics: list of document topics
+        - unused_topics: array of unused topics (topics not closest to any document)
+        of the given topic vectors.
+        - document_topics: array of the topic of each document
         """
 
-        document_topics = []
-        model_name, _, dv, tv, _, _ = self.load_model_components(file_paths)
         if verbose:
             print(model_name)
-        all_topics = set(range(tv.shape[0]))
-
-        for d_vector in tqdm(dv):
-            document_topics.append(np.argmax([cosine(d_vector, i) for i in tv]))
-
-        unused_topics = all_topics - set(document_topics)
+        # the lowest cosine similarity is the highest cosine distance, so this
+        # selects the same topic as the argmax over the cosine distances
+        # the matrix product uses BLAS, the numba kernel only pays off for a few topics
+        if _HAVE_NUMBA and tv.shape[0] <= _NUMBA_MAX_TOPICS:
+            tv_norms = np.linalg.norm(tv, axis=1)
+            document_topics = _least_similar_topics(dv, tv, tv_norms)
+        else:
+            tv_norm = ModelAnalyser.normalize_vectors(tv)
+            document_topics = np.empty(dv.shape[0], dtype=np.int64)
+            # score the documents in chunks, so the similarity matrix stays small
+            for start in tqdm(range(0, dv.shape[0], chunk_size)):
+                dv_chunk = dv[start:start + chunk_size]
+                dv_norm = dv_chunk / np.linalg.norm(dv_chunk, axis=1, keepdims=True)
+                document_topics[start:start + chunk_size] = (dv_norm @ tv_norm.T).argmin(axis=1)
+
+        unused = np.ones(tv.shape[0], dtype=bool)
+        unused[document_topics] = False
+        unused_topics = np.flatnonzero(unused)
 
         return unused_topics, document_topics
 
-    def add_isbn(self, file_paths, document_topics, non_dominant_topics_set, verbose=False):
+    def add_isbn(self, model_name, dv, tv, wv, document_ids, document_topics,
+                 non_dominant_topics, verbose=False):
         """
         Processes the Top2Vec models, extracts topic information,
         and identifies unmapped isbn topics.
 
         Parameters:
-        - model_path (list of str): Path to the Top2Vec model
-        - non_dominant_topics_set (set): Set of topics that are considered non-dominant.
-        - verbose (bool, optional): If True, a progress bar will be printed.
+        - model_name (str): The name of the model.
+        - dv, tv, wv (numpy.ndarray): Document, topic and word vectors.
+        - document_ids (list): List of document IDs corresponding to the document vectors.
+        - document_topics (numpy.ndarray): topic number of each document
+        - non_dominant_topics (iterable of int): topics that are considered non-dominant.
+        - verbose (bool, optional): If True, the model name will be printed.
 
         Returns:
         - tuple:
@@ -431,7 +734,6 @@ class ModelAnalyser:
         statistics_data = []
         unmapped_topic_data = []
 
-        model_name, _, dv, tv, wv, document_ids = self.load_model_components(file_paths)
         if verbose:
             print(model_name)
 
@@ -444,7 +746,10 @@ class ModelAnalyser:
             model_name, tv, document_ids, document_topics
         )
         # Remove non_dominant_topics from topics_without_isbn
-        topics_without_isbn_ = list(topics_without_isbn - non_dominant_topics_set)
+        unmapped = np.zeros(tv.shape[0], dtype=bool)
+        unmapped[topics_without_isbn] = True
+        unmapped[np.fromiter(non_dominant_topics, dtype=np.int64)] = False
+        topics_without_isbn_ = np.flatnonzero(unmapped).tolist()
 
         unmapped_topic_data.append({
             'model': model_name,
@@ -457,59 +762,135 @@ class ModelAnalyser:
 
         return statistics_df, topics_df, pd.DataFrame(unmapped_topic_data)
 
-    def run_summary(self, folder_path, verbose=False, out=""):
+    @staticmethod
+    def save_frame(df: pd.DataFrame, filename: str):
+        """
+        Save a dataframe as a csv file or, for a '.parquet' filename, as a zstd
+        compressed parquet file, which keeps list columns and dtypes intact.
         """
-        Run all analyses functions, merge its outputs and save the results as csv files.
+        if filename.endswith('.parquet'):
+            df.to_parquet(filename, compression='zstd', compression_level=1, index=False)
+        else:
+            df.to_csv(filename, index=False)
+
+    def run_summary(self, folder_path, verbose=False, out="", as_csv=False, workers=1):
+        """
+        Run all analyses functions, merge its outputs and save the results as parquet files.
+        With several workers, the model files are processed in parallel by spawned processes,
+        so a script that calls this must do so under `if __name__ == '__main__':`.
 
         Parameters:
         - folder_path (list of str): folder of the Top2Vec models.
         - verbose (boolean): whether you wish to have the model name printed
         - out (string): folder where to save the results
+        - as_csv (boolean): save the results as csv files instead, which is also
+          done if pyarrow is not installed
+        - workers (int, optional): number of worker processes, 1 by default. Each worker
+          uses an equal share of the available CPUs as threads for the topic assignment,
+          so a quarter of the CPUs is a good choice.
         """
         files = self._get_file_paths(folder_path)
-
+        extension = "csv" if as_csv or not _HAVE_PYARROW else "parquet"
         # create folder if that doesn't exist
         if not os.path.exists(out):
             os.makedirs(out)
 
-        for path in files:
-            model_metadata = self.extract_model_metadata(path)
-            model_name = model_metadata["model"].iloc[0]
+        process_model = partial(self._process_model, out=out, extension=extension, verbose=verbose)
+        if workers == 1 or len(files) <= 1:
+            for path in files:
+                process_model(path)
+            return
 
-            # extract dominant and non-dominant topics
-            non_dominant_topics, document_topics = self.get_topics(path, verbose)
+        threads_per_worker = max(1, _available_cpus() // workers)
+        # spawn fresh workers, as forked workers inherit the threading layer state
+        # of numba in this process and then hang at exit
+        with _thread_env(threads_per_worker), \
+                ProcessPoolExecutor(max_workers=workers, initializer=_limit_threads,
+                                    initargs=(threads_per_worker,),
+                                    mp_context=multiprocessing.get_context('spawn')) as executor:
+            list(executor.map(process_model, files))
 
-            # Extract stats, add isbn flag topics that are not mapped with an isbn
-            model_stats, model_topic, unmapped_topic_df = self.add_isbn(
-                path, document_topics, non_dominant_topics, verbose=False
-            )
+    def _process_model(self, path, out, extension, verbose=False):
+        """
+        Analyse a single model file and save its metadata and topics, see `run_summary`.
+        """
+        model_metadata = self.extract_model_metadata(path)
+        model_name = model_metadata["model"]
 
-            # merge and save metadata
-            metadata = model_metadata.merge(model_stats, on="model")
-            metadata_filename = f"{out}/metadata_{model_name}.csv"
-            try:
-                metadata.to_csv(metadata_filename, index=False)
-                print(f"Metadata for {model_name} saved successfully")
-            except IOError as error:
-                print(f"Error saving metadata for {model_name}: {str(error)}")
-
-            # merge and save topics
-            non_dominant_list = list(non_dominant_topics)
-            non_dominant_df = pd.DataFrame({
-                'model': [model_name],
-                'non_dominant_topics': [non_dominant_list]})
-
-            merged_df = model_topic.merge(unmapped_topic_df, on="model"). \
-                merge(non_dominant_df, on="model")
-            merged_filename = f"{out}/out_{model_name}.csv"
-            try:
-                merged_df.to_csv(merged_filename, index=False)
-                print(f"Topics for {model_name} saved successfully")
-            except IOError as error:
-                print(f"Error saving topics for {model_name}: {str(error)}")
+        # load the model once, only its vectors and document ids are needed,
+        # so its arrays are memory-mapped rather than read into memory
+        _, model, dv, tv, wv, document_ids = self.load_model_components(path, mmap_mode='r')
+        del model
+
+        # extract dominant and non-dominant topics
+        non_dominant_topics, document_topics = self.get_topics(model_name, dv, tv, verbose)
+
+        # Extract stats, add isbn flag topics that are not mapped with an isbn
+        model_stats, model_topic, unmapped_topic_df = self.add_isbn(
+            model_name, dv, tv, wv, document_ids, document_topics, non_dominant_topics,
+            verbose=False
+        )
+
+        # merge and save metadata, model_stats has a single row for this model
+        metadata = pd.DataFrame([{**model_metadata, **model_stats.iloc[0].to_dict()}])
+        metadata = metadata.astype(self.METADATA_DTYPES)
+        metadata_filename = f"{out}/metadata_{model_name}.{extension}"
+        try:
+            self.save_frame(metadata, metadata_filename)
+            print(f"Metadata for {model_name} saved successfully")
+        except IOError as error:
+            print(f"Error saving metadata for {model_name}: {str(error)}")
+
+        # merge and save topics
+        non_dominant_list = non_dominant_topics.tolist()
+        non_dominant_df = pd.DataFrame({
+            'model': [model_name],
+            'non_dominant_topics': [non_dominant_list]})
+
+        merged_df = model_topic.merge(unmapped_topic_df, on="model"). \
+            merge(non_dominant_df, on="model")
+        merged_filename = f"{out}/out_{model_name}.{extension}"
+        try:
+            self.save_frame(merged_df, merged_filename)
+            print(f"Topics for {model_name} saved successfully")
+        except IOError as error:
+            print(f"Error saving topics for {model_name}: {str(error)}")
+
+    @staticmethod
+    def normalize_vectors(vectors):
+        """
+        L2-normalize each row of a matrix of vectors, so that cosine similarities
+        between normalized vectors are dot products.
+
+        Parameters:
+        - vectors (numpy array): Matrix of vectors, e.g. the topic vectors.
+
+        Returns:
+        - numpy array: the normalized vectors
+        """
+        vectors = np.asarray(vectors, dtype=np.float64)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    @staticmethod
+    def _cosine_distances(doc_vector, topic_vector, normalized=False):
+        """
+        Returns the cosine distances between a document vector and all topic vectors.
+
+        Parameters:
+        - doc_vector (numpy array): The document vector.
+        - topic_vector (numpy array): Matrix of all topic vectors.
+        - normalized (bool, optional): whether topic_vector is already L2-normalized.
+
+        Returns:
+        - numpy array: cosine distance to each topic
+        """
+        doc_vector = np.asarray(doc_vector, dtype=np.float64)
+        if not normalized:
+            topic_vector = ModelAnalyser.normalize_vectors(topic_vector)
+        return 1.0 - topic_vector @ (doc_vector / np.linalg.norm(doc_vector))
 
     @staticmethod
-    def closest_topics(doc_vector, topic_vector, n=5):
+    def closest_topics(doc_vector, topic_vector, n=5, normalized=False):
         """
         Returns the indices of the 'n' closest topics for a given document vector.
 
@@ -517,19 +898,22 @@ class ModelAnalyser:
         - doc_vector (numpy array): The document vector.
         - topic_vectors (list of numpy arrays): List of all topic vectors.
         - n (int, optional): Number of closest topics to retrieve. Defaults to 5.
+        - normalized (bool, optional): whether the topic vectors are already normalized
+          with `normalize_vectors`, which saves normalizing them for every document.
 
         Returns:
         - idx_closest_topics: Indices of the 'n' closest topics.
         - list of float: cosine distance of the topics' indices
         """
-        # Calculate cosine distances for all topic vectors
-        distances = [cosine(doc_vector, tv) for tv in topic_vector]
-        # Get the indices of the 'n' closest topics
-        idx_closest_topics = np.argsort(distances)[:n]
-        return idx_closest_topics, [distances[i] for i in idx_closest_topics]
+        distances = ModelAnalyser._cosine_distances(doc_vector, topic_vector, normalized)
+        n = min(n, len(distances))
+        # select the 'n' closest topics without sorting all distances, then order them
+        idx_closest_topics = np.argpartition(distances, n - 1)[:n] if n > 0 else np.arange(0)
+        idx_closest_topics = idx_closest_topics[np.argsort(distances[idx_closest_topics])]
+        return idx_closest_topics, distances[idx_closest_topics].tolist()
 
     @staticmethod
-    def closest_topics_1stQuartile(doc_vector, topic_vector):
+    def closest_topics_1stQuartile(doc_vector, topic_vector, normalized=False):
 
         """
         Returns the indices of the closest topics (in the 1st quartile) for a given document vector.
@@ -537,18 +921,20 @@ class ModelAnalyser:
         Parameters:
         - doc_vector (numpy array): The document vector.
         - topic_vectors (list of numpy arrays): List of all topic vectors.
+        - normalized (bool, optional): whether the topic vectors are already normalized
+          with `normalize_vectors`, which saves normalizing them for every document.
 
         Returns:
         - idx_closest_topics: Indices of the topics in the closest quartile.
         - list of float: cosine distance of the topics' indices
         """
-        distances = [cosine(doc_vector, tv) for tv in topic_vector]
+        distances = ModelAnalyser._cosine_distances(doc_vector, topic_vector, normalized)
         threshold = np.percentile(distances, 25)
 
         # get indices of the topics in the closest quartile
-        idx_closest_topics = np.where(np.array(distances) <= threshold)[0].tolist()
+        idx_closest_topics = np.flatnonzero(distances <= threshold)
 
-        return idx_closest_topics, [distances[i] for i in idx_closest_topics]
+        return idx_closest_topics.tolist(), distances[idx_closest_topics].tolist()
 
 
 